@@ -1,14 +1,28 @@
 import os
-import shutil
+import queue
+import re
 import sqlite3
 import threading
 import time
-from datetime import datetime, timedelta
-from hashlib import sha256
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import hmac
+from hashlib import pbkdf2_hmac, sha256
 from tkinter import * # type: ignore
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from fpdf import FPDF
-from tkcalendar import DateEntry
+
+# tkcalendar se importa perezosamente (ver _get_date_entry): el arranque no
+# paga el costo del widget de calendario hasta construir la pestaña
+_DateEntry = None
+
+def _get_date_entry():
+    global _DateEntry
+    if _DateEntry is None:
+        from tkcalendar import DateEntry
+        _DateEntry = DateEntry
+    return _DateEntry
 
 
 # ----------------------------------------------
@@ -18,167 +32,519 @@ BACKUP_FOLDER = "backups"
 APP_VERSION = "1.0.0"
 VERSION_CHECK_FILE = "version.txt"  # archivo local o remoto para actualización automática (ejemplo básico)
 
+# Comparar versiones como tuplas de enteros: "10.0.0" > "9.0.0", cosa que
+# la comparación de cadenas hace mal
+def _parse_ver(s):
+    return tuple(int(x) for x in s.strip().split("."))
+
+APP_VERSION_T = _parse_ver(APP_VERSION)
+
+# Formato de marca de tiempo para nombres de reporte
+_TS_FMT = "%Y%m%d_%H%M%S"
+
+# Valores compartidos por los Combobox de las pestañas: una sola tupla
+# reutilizada en vez de listas nuevas por cada reconstrucción de pestaña
+MONEDAS = ("Bs", "USD")
+TIPOS_TRANSACCION = ("entrada", "salida")
+MEDIOS = ("fisico", "digital")
+
 # ----------------------------------------------
 # BASE DE DATOS - CONEXIÓN Y CREACIÓN DE TABLAS
 
 class DB:
     _conn = None
     _lock = threading.Lock()
+    _readers = None
+    _N_READERS = 3  # hilo de Tk + los 2 workers del pool de fondo
+    # Contador de escrituras en proceso: las cachés de agregados lo usan
+    # como clave de invalidación barata
+    _data_version = 0
+
+    # PRAGMAs aplicados una sola vez al abrir la conexión:
+    # WAL permite lectores concurrentes con el escritor y synchronous=NORMAL
+    # reduce los fsync por commit a la mitad.
+    _PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA foreign_keys=ON",
+    )
 
     @classmethod
     def connect(cls):
         if cls._conn is None:
-            cls._conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+            # cached_statements alto: las consultas calientes se re-ejecutan
+            # sin volver a parsear el SQL
+            cls._conn = sqlite3.connect(DB_NAME, check_same_thread=False,
+                                        cached_statements=256)
             cls._conn.row_factory = sqlite3.Row
+            for pragma in cls._PRAGMAS:
+                cls._conn.execute(pragma)
         return cls._conn
 
     @classmethod
-    def execute(cls, sql, params=()):
+    def execute(cls, sql, params=(), commit=True):
+        # La conexión se resuelve una sola vez por llamada, fuera del lock.
+        # commit=False deja la escritura pendiente para agruparla con otras.
+        conn = cls.connect()
         with cls._lock:
-            c = cls.connect().cursor()
-            c.execute(sql, params)
-            cls.connect().commit()
+            # conn.execute pasa por el caché de sentencias preparadas
+            c = conn.execute(sql, params)
+            if commit:
+                conn.commit()
+            cls._data_version += 1
             return c
 
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        # Agrupa varias escrituras en un solo commit: una transacción y un
+        # fsync cubren todo el bloque
+        conn = cls.connect()
+        with cls._lock, conn:
+            yield conn
+        cls._data_version += 1
+
+    @classmethod
+    def executemany(cls, sql, seq):
+        # Un solo BEGIN/COMMIT (un fsync) para todo el lote
+        conn = cls.connect()
+        with cls._lock, conn:
+            cur = conn.executemany(sql, seq)
+        cls._data_version += 1
+        return cur
+
+    @classmethod
+    def data_version(cls):
+        return cls._data_version
+
+    # PRAGMAs por lector: journal_mode/synchronous no aplican en modo ro
+    _PRAGMAS_RO = (
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    @classmethod
+    def _reader_pool(cls):
+        # Pool acotado de conexiones de solo lectura: con WAL los lectores
+        # no compiten con el escritor ni entre sí por el lock global
+        if cls._readers is None:
+            cls.connect()  # garantiza que el archivo y el WAL existan
+            pool = queue.Queue(maxsize=cls._N_READERS)
+            for _ in range(cls._N_READERS):
+                conn = sqlite3.connect(f"file:{DB_NAME}?mode=ro", uri=True,
+                                       check_same_thread=False,
+                                       cached_statements=256)
+                conn.row_factory = sqlite3.Row
+                for pragma in cls._PRAGMAS_RO:
+                    conn.execute(pragma)
+                pool.put(conn)
+            cls._readers = pool
+        return cls._readers
+
     @classmethod
     def query(cls, sql, params=()):
-        with cls._lock:
-            c = cls.connect().cursor()
-            c.execute(sql, params)
-            return c.fetchall()
+        pool = cls._reader_pool()
+        conn = pool.get()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            pool.put(conn)
+
+    _prepared = {}
+
+    @classmethod
+    def prepare(cls, sql):
+        # Devuelve un ejecutor ligado a la conexión para un SQL fijo: el texto
+        # se resuelve una sola vez y cada llamada cae directo en la caché de
+        # sentencias compiladas de sqlite3. Filas como tuplas crudas.
+        fn = cls._prepared.get(sql)
+        if fn is None:
+            pool = cls._reader_pool()
+
+            def run(params=()):
+                conn = pool.get()
+                try:
+                    cur = conn.execute(sql, params)
+                    cur.row_factory = None
+                    return cur.fetchall()
+                finally:
+                    pool.put(conn)
+
+            fn = cls._prepared[sql] = run
+        return fn
+
+    @classmethod
+    def query_tuples(cls, sql, params=()):
+        # Filas como tuplas crudas (sin sqlite3.Row): el acceso es posicional
+        # y la tupla puede pasarse tal cual a tree.insert(values=...)
+        pool = cls._reader_pool()
+        conn = pool.get()
+        try:
+            cur = conn.execute(sql, params)
+            cur.row_factory = None
+            return cur.fetchall()
+        finally:
+            pool.put(conn)
+
+    @classmethod
+    def iter(cls, sql, params=()):
+        # Itera el cursor sin materializar fetchall(): los recorridos largos
+        # de solo lectura no duplican todas las filas en memoria
+        return iter(cls.connect().execute(sql, params))
 
     @classmethod
     def close(cls):
+        if cls._readers is not None:
+            while not cls._readers.empty():
+                cls._readers.get_nowait().close()
+            cls._readers = None
+        cls._prepared.clear()
         if cls._conn:
             cls._conn.close()
             cls._conn = None
 
 
+# Esquema completo en un solo script: executescript lo parsea y ejecuta en
+# una única transacción implícita. SCHEMA_VERSION se guarda en PRAGMA
+# user_version para omitir todo el DDL en arranques posteriores; debe
+# incrementarse cada vez que _DDL cambie.
+SCHEMA_VERSION = 5
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    apellido TEXT NOT NULL,
+    cedula TEXT NOT NULL UNIQUE,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    tipo TEXT NOT NULL CHECK(tipo IN ('master','estandar'))
+);
+CREATE TABLE IF NOT EXISTS transacciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario TEXT NOT NULL,
+    tipo TEXT NOT NULL CHECK(tipo IN ('entrada','salida')),
+    monto REAL NOT NULL,
+    moneda TEXT NOT NULL CHECK(moneda IN ('Bs','USD')),
+    medio TEXT NOT NULL CHECK(medio IN ('fisico','digital')),
+    banco TEXT NULL CHECK(banco IN ('ninguno','ven', 'mercantil', 'banesco')) DEFAULT 'ven',
+    descripcion TEXT,
+    eliminado INTEGER DEFAULT 0,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS cuentas_por_cobrar (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cliente TEXT NOT NULL,
+    monto REAL NOT NULL,
+    moneda TEXT NOT NULL CHECK(moneda IN ('Bs','USD')),
+    fecha_vencimiento DATE NOT NULL,
+    estado TEXT NOT NULL CHECK(estado IN ('pendiente','pagada','vencida')) DEFAULT 'pendiente',
+    descripcion TEXT,
+    fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS cuentas_por_pagar (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    proveedor TEXT NOT NULL,
+    monto REAL NOT NULL,
+    moneda TEXT NOT NULL CHECK(moneda IN ('Bs','USD')),
+    fecha_vencimiento DATE NOT NULL,
+    estado TEXT NOT NULL CHECK(estado IN ('pendiente','pagada','vencida')) DEFAULT 'pendiente',
+    descripcion TEXT,
+    fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS historial_cambios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario TEXT NOT NULL,
+    accion TEXT NOT NULL,
+    tabla TEXT NOT NULL,
+    registro_id INTEGER NOT NULL,
+    descripcion TEXT,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Índices para los patrones de consulta calientes: los ORDER BY por fecha /
+-- fecha_vencimiento se sirven del índice sin paso de ordenamiento y los SUM
+-- por tipo quedan cubiertos por (tipo, monto).
+CREATE INDEX IF NOT EXISTS idx_tx_fecha ON transacciones(fecha DESC);
+CREATE INDEX IF NOT EXISTS idx_tx_tipo ON transacciones(tipo, monto);
+CREATE INDEX IF NOT EXISTS idx_tx_filter ON transacciones(eliminado, moneda, banco, tipo);
+CREATE INDEX IF NOT EXISTS idx_cxc_venc ON cuentas_por_cobrar(fecha_vencimiento);
+CREATE INDEX IF NOT EXISTS idx_cxp_venc ON cuentas_por_pagar(fecha_vencimiento);
+CREATE INDEX IF NOT EXISTS idx_hist_fecha ON historial_cambios(fecha DESC);
+CREATE INDEX IF NOT EXISTS idx_tx_mon_fecha ON transacciones(moneda, date(fecha)) WHERE eliminado = 0;
+CREATE INDEX IF NOT EXISTS idx_tx_bal ON transacciones(moneda, tipo, monto) WHERE eliminado = 0;
+"""
+
 def init_db():
-    DB.execute("""
-    CREATE TABLE IF NOT EXISTS usuarios (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nombre TEXT NOT NULL,
-        apellido TEXT NOT NULL,
-        cedula TEXT NOT NULL UNIQUE,
-        username TEXT NOT NULL UNIQUE,
-        password TEXT NOT NULL,
-        tipo TEXT NOT NULL CHECK(tipo IN ('master','estandar'))
-    )
-    """)
-    DB.execute("""
-    CREATE TABLE IF NOT EXISTS transacciones (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        usuario TEXT NOT NULL,
-        tipo TEXT NOT NULL CHECK(tipo IN ('entrada','salida')),
-        monto REAL NOT NULL,
-        moneda TEXT NOT NULL CHECK(moneda IN ('Bs','USD')),
-        medio TEXT NOT NULL CHECK(medio IN ('fisico','digital')),
-        banco TEXT NULL CHECK(banco IN ('ninguno','ven', 'mercantil', 'banesco')) DEFAULT 'ven',
-        descripcion TEXT,
-        eliminado INTEGER DEFAULT 0,
-        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    DB.execute("""
-    CREATE TABLE IF NOT EXISTS cuentas_por_cobrar (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        cliente TEXT NOT NULL,
-        monto REAL NOT NULL,
-        moneda TEXT NOT NULL CHECK(moneda IN ('Bs','USD')),
-        fecha_vencimiento DATE NOT NULL,
-        estado TEXT NOT NULL CHECK(estado IN ('pendiente','pagada','vencida')) DEFAULT 'pendiente',
-        descripcion TEXT,
-        fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    DB.execute("""
-    CREATE TABLE IF NOT EXISTS cuentas_por_pagar (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        proveedor TEXT NOT NULL,
-        monto REAL NOT NULL,
-        moneda TEXT NOT NULL CHECK(moneda IN ('Bs','USD')),
-        fecha_vencimiento DATE NOT NULL,
-        estado TEXT NOT NULL CHECK(estado IN ('pendiente','pagada','vencida')) DEFAULT 'pendiente',
-        descripcion TEXT,
-        fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    DB.execute("""
-    CREATE TABLE IF NOT EXISTS historial_cambios (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        usuario TEXT NOT NULL,
-        accion TEXT NOT NULL,
-        tabla TEXT NOT NULL,
-        registro_id INTEGER NOT NULL,
-        descripcion TEXT,
-        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
+    conn = DB.connect()
+    with DB._lock:
+        if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+            return
+        conn.executescript(_DDL)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
 
 init_db()
 
 # ----------------------------------------------
 # UTILIDADES
 
+# hashlib.sha256 está respaldado por OpenSSL (ruta SHA-NI acelerada por
+# hardware); se enlaza una vez a nivel de módulo para que verificaciones
+# masivas no paguen la búsqueda de atributo por llamada.
+_sha256 = sha256
+
+# KDF adaptativo con sal: los hashes nuevos se guardan como
+# "iteraciones$sal_hex$hash_hex"; los sha256 planos anteriores se siguen
+# verificando por la rama heredada de _verify_password
+_PBKDF2_ITER = 200_000
+
 def hash_password(password):
-    return sha256(password.encode('utf-8')).hexdigest()
+    salt = os.urandom(16)
+    dk = pbkdf2_hmac('sha256', password.encode('utf-8'), salt, _PBKDF2_ITER)
+    return f"{_PBKDF2_ITER}${salt.hex()}${dk.hex()}"
+
+def _verify_password(password, hashed):
+    # Comparación en tiempo constante: no filtra por timing cuántos
+    # caracteres del hash coinciden
+    if "$" in hashed:
+        iteraciones, salt_hex, hash_hex = hashed.split("$")
+        dk = pbkdf2_hmac('sha256', password.encode('utf-8'),
+                         bytes.fromhex(salt_hex), int(iteraciones))
+        return hmac.compare_digest(dk.hex(), hash_hex)
+    # Hash heredado: sha256 simple en hexadecimal
+    return hmac.compare_digest(_sha256(password.encode('utf-8')).hexdigest(), hashed)
+
+# Caché de verificaciones de la sesión: el PBKDF2 (deliberadamente caro)
+# se paga una vez por credencial; la clave guarda un digest, no la clave
+_verify_cache = {}
 
 def check_password(password, hashed):
-    return hash_password(password) == hashed
+    key = (_sha256(password.encode('utf-8')).hexdigest(), hashed)
+    hit = _verify_cache.get(key)
+    if hit is None:
+        hit = _verify_password(password, hashed)
+        if len(_verify_cache) >= 32:
+            _verify_cache.clear()
+        _verify_cache[key] = hit
+    return hit
+
+# Validador de fecha compilado una sola vez: la regex descarta formatos
+# inválidos sin pagar una excepción y date.fromisoformat es la vía rápida
+# en C (evita re-interpretar el patrón de strptime en cada llamada)
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+def parse_fecha_iso(texto):
+    if not _DATE_RE.match(texto):
+        return None
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        return None
+
+# Igual que con las fechas: la regex rechaza montos inválidos sin pagar
+# el levantamiento/captura de una excepción en el camino común
+_MONTO_RE = re.compile(r"^[+-]?(?:\d+(?:\.\d*)?|\.\d+)$")
+
+def parse_monto(texto):
+    texto = texto.strip()
+    if not _MONTO_RE.match(texto):
+        return None
+    return float(texto)
+
+def _clear_entries(*entries):
+    # Vacía varios Entry con una sola llamada auxiliar
+    for e in entries:
+        e.delete(0, END)
+
+def _setup_tree_columns(tree, cols, width, minwidth=50):
+    # Configura encabezados y anchos en un solo punto; se mantiene la API de
+    # ttk (que cita las opciones de forma segura) en vez de un eval de Tcl
+    for c in cols:
+        tree.heading(c, text=c)
+        tree.column(c, minwidth=minwidth, width=width, stretch=False)
+
+# La carpeta de backups se verifica una sola vez por proceso: las corridas
+# siguientes se ahorran el stat()
+_backup_folder_ready = False
 
 def backup_database():
-    if not os.path.exists(BACKUP_FOLDER):
-        os.makedirs(BACKUP_FOLDER)
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    global _backup_folder_ready
+    if not _backup_folder_ready:
+        os.makedirs(BACKUP_FOLDER, exist_ok=True)
+        _backup_folder_ready = True
+    # isoformat es ruta C pura; se evita el escáner de formato de strftime
+    timestamp = datetime.now().isoformat(sep="_", timespec="seconds").replace(":", "-")
     backup_name = f"backup_{timestamp}.db"
-    src = DB_NAME
     dst = os.path.join(BACKUP_FOLDER, backup_name)
     try:
-        shutil.copy2(src, dst)
+        # API de backup en línea de SQLite: copia por páginas y coopera con
+        # escritores concurrentes (copiar el archivo con la conexión abierta
+        # bajo WAL puede producir un respaldo corrupto). El pacing
+        # pages/sleep deja respirar a la interfaz entre lotes.
+        dst_conn = sqlite3.connect(dst)
+        try:
+            DB.connect().backup(dst_conn, pages=1000, sleep=0.05)
+        finally:
+            dst_conn.close()
         return True, dst
     except Exception as e:
         return False, str(e)
 
-def log_change(usuario, accion, tabla, registro_id, descripcion=None):
-    DB.execute("""
+# Versión en proceso del historial: cada escritura la incrementa y las
+# vistas pueden saltarse la consulta si su copia sigue vigente
+_HIST_VERSION = [0]
+
+# SQL caliente como constantes de módulo: pasar siempre el mismo objeto
+# string garantiza el hit en la caché de sentencias compiladas de sqlite3
+SQL_LOG = """
     INSERT INTO historial_cambios (usuario, accion, tabla, registro_id, descripcion)
     VALUES (?, ?, ?, ?, ?)
-    """, (usuario, accion, tabla, registro_id, descripcion))
-
+    """
+SQL_GET_USER = "SELECT * FROM usuarios WHERE username = ?"
+SQL_LOAD_TX = ("SELECT id, usuario, tipo, monto, moneda, medio, banco, descripcion, fecha"
+               " FROM transacciones WHERE eliminado = 0 ORDER BY fecha DESC LIMIT ? OFFSET ?")
+SQL_LOAD_DELETED = ("SELECT id, usuario, tipo, monto, moneda, medio, descripcion, fecha"
+                    " FROM transacciones WHERE eliminado = 1 ORDER BY fecha DESC LIMIT ? OFFSET ?")
+SQL_INSERT_TX = """
+    INSERT INTO transacciones (usuario, tipo, monto, moneda, medio, banco, descripcion, fecha)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+SQL_LOAD_CXC = ("SELECT id, cliente, printf('%.2f', monto), moneda, fecha_vencimiento, estado, descripcion, fecha_registro"
+                " FROM cuentas_por_cobrar ORDER BY fecha_vencimiento")
+SQL_LOAD_CXP = ("SELECT id, proveedor, printf('%.2f', monto), moneda, fecha_vencimiento, estado, descripcion, fecha_registro"
+                " FROM cuentas_por_pagar ORDER BY fecha_vencimiento")
+SQL_INSERT_CXC = """
+    INSERT INTO cuentas_por_cobrar (cliente, monto, moneda, fecha_vencimiento, descripcion)
+    VALUES (?, ?, ?, ?, ?)
+    """
+SQL_INSERT_CXP = """
+    INSERT INTO cuentas_por_pagar (proveedor, monto, moneda, fecha_vencimiento, descripcion)
+    VALUES (?, ?, ?, ?, ?)
+    """
+SQL_PAY_CXC = "UPDATE cuentas_por_cobrar SET estado = 'pagada' WHERE id = ?"
+SQL_PAY_CXP = "UPDATE cuentas_por_pagar SET estado = 'pagada' WHERE id = ?"
+SQL_SUM_TX = ("SELECT moneda, tipo, SUM(monto) as total FROM transacciones"
+              " WHERE eliminado = 0 GROUP BY moneda, tipo")
+SQL_SUM_CXC = ("SELECT moneda, SUM(monto) as total FROM cuentas_por_cobrar"
+               " WHERE estado='pagada' GROUP BY moneda")
+SQL_SUM_CXP = ("SELECT moneda, SUM(monto) as total FROM cuentas_por_pagar"
+               " WHERE estado='pagada' GROUP BY moneda")
+# Los seis balances del comparativo (3 ventanas x 2 monedas) salen de una
+# sola pasada: un SUM con FILTER por ventana, agrupado por moneda
+SQL_COMPARATIVO = """
+    SELECT moneda,
+           SUM(CASE WHEN tipo='entrada' THEN monto ELSE -monto END)
+               FILTER (WHERE date(fecha) >= :hoy) AS dia,
+           SUM(CASE WHEN tipo='entrada' THEN monto ELSE -monto END)
+               FILTER (WHERE date(fecha) >= :hace_7) AS semana,
+           SUM(CASE WHEN tipo='entrada' THEN monto ELSE -monto END) AS mes
+    FROM transacciones
+    WHERE eliminado = 0 AND date(fecha) >= :hace_30
+    GROUP BY moneda
+    """
+
+def log_change(usuario, accion, tabla, registro_id, descripcion=None, conn=None):
+    # Con conn se escribe dentro de una transacción ya abierta (DB.transaction)
+    # para que la operación y su registro compartan el mismo commit
+    params = (usuario, accion, tabla, registro_id, descripcion)
+    if conn is not None:
+        conn.execute(SQL_LOG, params)
+    else:
+        DB.execute(SQL_LOG, params)
+    _HIST_VERSION[0] += 1
+
+# Memoizado por sesión: los chequeos repetidos de login/registro no vuelven
+# a la base. Se invalida con get_user.cache_clear() al insertar usuarios.
+@lru_cache(maxsize=128)
 def get_user(username):
-    rows = DB.query("SELECT * FROM usuarios WHERE username = ?", (username,))
+    rows = DB.query(SQL_GET_USER, (username,))
     return rows[0] if rows else None
 
 # ----------------------------------------------
 # REPORTES PDF
 
-class PDFReport(FPDF):
-    def header(self):
-        self.set_font("Arial", 'B', 12)
-        self.cell(0, 10, "Reporte Financiero", border=0, ln=1, align='C')
-        self.ln(5)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", 'I', 8)
-        self.cell(0, 10, f"Página {self.page_no()}", 0, 0, 'C')
+# fpdf se importa perezosamente, igual que tkcalendar: el arranque no paga
+# el costo del módulo hasta que se genera el primer reporte
+_PDFReport = None
+
+def _get_pdf_report():
+    global _PDFReport
+    if _PDFReport is None:
+        from fpdf import FPDF
+
+        class PDFReport(FPDF):
+            def header(self):
+                self.set_font("Arial", 'B', 12)
+                self.cell(0, 10, "Reporte Financiero", border=0, ln=1, align='C')
+                self.ln(5)
+
+            def footer(self):
+                self.set_y(-15)
+                self.set_font("Arial", 'I', 8)
+                self.cell(0, 10, f"Página {self.page_no()}", 0, 0, 'C')
+
+        _PDFReport = PDFReport
+    return _PDFReport
+
+# Todos los agregados del reporte en un solo round-trip: cada tabla aporta
+# sus filas vía UNION ALL y Python separa por la columna src
+SQL_REPORT_TOTALS = """
+    SELECT 'tx' AS src, moneda, medio, banco, tipo, SUM(monto) AS total
+      FROM transacciones WHERE eliminado = 0
+     GROUP BY moneda, medio, banco, tipo
+    UNION ALL
+    SELECT 'cxc', moneda, NULL, NULL, NULL, SUM(monto)
+      FROM cuentas_por_cobrar WHERE estado = 'pagada' GROUP BY moneda
+    UNION ALL
+    SELECT 'cxp', moneda, NULL, NULL, NULL, SUM(monto)
+      FROM cuentas_por_pagar WHERE estado = 'pagada' GROUP BY moneda
+    """
+
+def _report_totals():
+    # Devuelve (matriz de transacciones, cxc pagadas, cxp pagadas); el pivot
+    # por banco/moneda/tipo se hace en Python sobre los dicts
+    matriz, cxc, cxp = {}, {}, {}
+    for src, moneda, medio, banco, tipo, total in DB.query_tuples(SQL_REPORT_TOTALS):
+        if src == 'tx':
+            matriz[(moneda, medio, banco, tipo)] = total
+        elif src == 'cxc':
+            cxc[moneda] = total
+        else:
+            cxp[moneda] = total
+    return matriz, cxc, cxp
+
+def _suma(matriz, moneda=None, medio=None, banco=None, tipo=None):
+    # Agrega sobre la matriz ya cargada; None significa "cualquier valor"
+    return sum(
+        total for (m, md, b, t), total in matriz.items()
+        if (moneda is None or m == moneda)
+        and (medio is None or md == medio)
+        and (banco is None or b == banco)
+        and (tipo is None or t == tipo)
+    )
 
 def generate_pdf_report(username, filename="reporte_financiero.pdf"):
-    pdf = PDFReport()
+    pdf = _get_pdf_report()()
     pdf.add_page()
     pdf.set_font("Arial", '', 11)
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # isoformat con timespec produce el mismo "YYYY-MM-DD HH:MM:SS" sin
+    # pasar por el escáner de formato de strftime
+    now = datetime.now().isoformat(sep=" ", timespec="seconds")
     pdf.cell(0, 10, f"Usuario: {username}", ln=1)
     pdf.cell(0, 10, f"Fecha y hora: {now}", ln=1)
     pdf.ln(5)
 
-    # Resumen transacciones
-    entradas = DB.query("SELECT SUM(monto) as total FROM transacciones WHERE tipo='entrada' AND eliminado = 0")
-    salidas = DB.query("SELECT SUM(monto) as total FROM transacciones WHERE tipo='salida' AND eliminado = 0")
-
-    total_entrada = entradas[0]["total"] or 0
-    total_salida = salidas[0]["total"] or 0
+    # Toda la agregación del reporte sale de una sola consulta UNION ALL
+    matriz, cxc, cxp = _report_totals()
+    total_entrada = _suma(matriz, tipo='entrada')
+    total_salida = _suma(matriz, tipo='salida')
 
     pdf.ln(10)
 
@@ -186,64 +552,46 @@ def generate_pdf_report(username, filename="reporte_financiero.pdf"):
     bancos = ['ven', 'mercantil', 'banesco']
     monedas = ['Bs', 'USD']
 
+    # Cada sección se arma como texto y se emite con un solo multi_cell:
+    # FPDF valida fuente y saltos de página por bloque, no por línea
     pdf.cell(0, 10, "Transacciones Bancarias:", ln=1)
-    pdf.cell(0, 8, "Moneda: Bs", ln=1)
+    lineas = ["Moneda: Bs"]
     total_moneda = 0
     for banco in bancos:
-        entradas = DB.query("""
-            SELECT SUM(monto) as total FROM transacciones
-            WHERE tipo='entrada' AND eliminado = 0 AND moneda='Bs' AND medio='digital' AND banco=?
-        """, (banco,))
-        salidas = DB.query("""
-            SELECT SUM(monto) as total FROM transacciones
-            WHERE tipo='salida' AND eliminado = 0 AND moneda='Bs' AND medio='digital' AND banco=?
-        """, (banco,))
-
-        total_entrada = entradas[0]["total"] or 0
-        total_salida = salidas[0]["total"] or 0
+        total_entrada = _suma(matriz, moneda='Bs', medio='digital', banco=banco, tipo='entrada')
+        total_salida = _suma(matriz, moneda='Bs', medio='digital', banco=banco, tipo='salida')
         balance_banco = total_entrada - total_salida
         total_moneda += balance_banco
 
-        pdf.cell(0, 8, f" - {banco.capitalize()}:", ln=1)
-        pdf.cell(0, 8, f"    Entradas: {total_entrada:.2f}", ln=1)
-        pdf.cell(0, 8, f"    Salidas: {total_salida:.2f}", ln=1)
-        pdf.cell(0, 8, f"    Balance: {balance_banco:.2f}", ln=1)
+        lineas.append(f" - {banco.capitalize()}:")
+        lineas.append(f"    Entradas: {total_entrada:.2f}")
+        lineas.append(f"    Salidas: {total_salida:.2f}")
+        lineas.append(f"    Balance: {balance_banco:.2f}")
 
-    pdf.cell(0, 8, f"Total Bs: {total_moneda:.2f}", ln=1)
+    lineas.append(f"Total Bs: {total_moneda:.2f}")
+    pdf.multi_cell(0, 8, "\n".join(lineas))
     pdf.ln(5)
 
 
     # Transacciones físicas por moneda
     pdf.ln(5)
     pdf.cell(0, 10, "Transacciones Físicas por Moneda:", ln=1)
+    lineas = []
     for moneda in monedas:
-        pdf.cell(0, 10, f"Moneda: {moneda}", ln=1)
-        entradas = DB.query("""
-            SELECT SUM(monto) as total FROM transacciones
-            WHERE tipo='entrada' AND eliminado = 0 AND moneda=? AND medio='fisico'
-        """, (moneda,))
-        salidas = DB.query("""
-            SELECT SUM(monto) as total FROM transacciones
-            WHERE tipo='salida' AND eliminado = 0 AND moneda=? AND medio='fisico'
-        """, (moneda,))
-        total_entrada = entradas[0]["total"] or 0
-        total_salida = salidas[0]["total"] or 0
+        total_entrada = _suma(matriz, moneda=moneda, medio='fisico', tipo='entrada')
+        total_salida = _suma(matriz, moneda=moneda, medio='fisico', tipo='salida')
         balance = total_entrada - total_salida
-        pdf.cell(0, 8, f"    Entradas: {total_entrada:.2f}", ln=1)
-        pdf.cell(0, 8, f"    Salidas: {total_salida:.2f}", ln=1)
-        pdf.cell(0, 8, f"    Balance: {balance:.2f}", ln=1)
-
-    # Bs
-    total_bs = DB.query("SELECT SUM(CASE WHEN tipo='entrada' THEN monto ELSE -monto END) as total FROM transacciones WHERE eliminado = 0 AND moneda = 'Bs'")[0]["total"] or 0
-    cxc_bs = DB.query("SELECT SUM(monto) as total FROM cuentas_por_cobrar WHERE estado = 'pagada' AND moneda = 'Bs'")[0]["total"] or 0
-    cxp_bs = DB.query("SELECT SUM(monto) as total FROM cuentas_por_pagar WHERE estado = 'pagada' AND moneda = 'Bs'")[0]["total"] or 0
-    balance_bs = total_bs + cxc_bs - cxp_bs
-
-    # USD
-    total_usd = DB.query("SELECT SUM(CASE WHEN tipo='entrada' THEN monto ELSE -monto END) as total FROM transacciones WHERE eliminado = 0 AND moneda = 'USD'")[0]["total"] or 0
-    cxc_usd = DB.query("SELECT SUM(monto) as total FROM cuentas_por_cobrar WHERE estado = 'pagada' AND moneda = 'USD'")[0]["total"] or 0
-    cxp_usd = DB.query("SELECT SUM(monto) as total FROM cuentas_por_pagar WHERE estado = 'pagada' AND moneda = 'USD'")[0]["total"] or 0
-    balance_usd = total_usd + cxc_usd - cxp_usd
+        lineas.append(f"Moneda: {moneda}")
+        lineas.append(f"    Entradas: {total_entrada:.2f}")
+        lineas.append(f"    Salidas: {total_salida:.2f}")
+        lineas.append(f"    Balance: {balance:.2f}")
+    pdf.multi_cell(0, 8, "\n".join(lineas))
+
+    total_bs = _suma(matriz, moneda='Bs', tipo='entrada') - _suma(matriz, moneda='Bs', tipo='salida')
+    balance_bs = total_bs + cxc.get('Bs', 0) - cxp.get('Bs', 0)
+
+    total_usd = _suma(matriz, moneda='USD', tipo='entrada') - _suma(matriz, moneda='USD', tipo='salida')
+    balance_usd = total_usd + cxc.get('USD', 0) - cxp.get('USD', 0)
 
     pdf.ln(5)
     pdf.cell(0, 10, f"Balance Total General:", ln=1)
@@ -251,18 +599,27 @@ def generate_pdf_report(username, filename="reporte_financiero.pdf"):
     pdf.cell(0, 8, f" - En USD: {balance_usd:.2f}", ln=1)
     pdf.ln(5)
 
-    # Cuentas por cobrar
+    # Formato precompilado: sin re-parsear el f-string en el bucle caliente
+    fmt_cuenta = "{} - {} {} - Vence: {} - Estado: {}".format
+
+    # Un solo multi_cell por sección en vez de un pdf.cell por fila: FPDF
+    # valida fuente y saltos de página una vez por bloque, no por registro
+    pdf.set_font("Arial", '', 11)
+
+    # Cuentas por cobrar (streaming: fila a fila, sin fetchall)
     pdf.cell(0, 10, "Cuentas por Cobrar:", ln=1)
-    cxc = DB.query("SELECT * FROM cuentas_por_cobrar ORDER BY fecha_vencimiento")
-    for c in cxc:
-        pdf.cell(0, 8, f"{c['cliente']} - {c['monto']} {c['moneda']} - Vence: {c['fecha_vencimiento']} - Estado: {c['estado']}", ln=1)
+    texto = "\n".join(fmt_cuenta(c['cliente'], c['monto'], c['moneda'], c['fecha_vencimiento'], c['estado'])
+                      for c in DB.iter("SELECT cliente, monto, moneda, fecha_vencimiento, estado FROM cuentas_por_cobrar ORDER BY fecha_vencimiento"))
+    if texto:
+        pdf.multi_cell(0, 8, texto)
 
     pdf.ln(5)
     # Cuentas por pagar
     pdf.cell(0, 10, "Cuentas por Pagar:", ln=1)
-    cxp = DB.query("SELECT * FROM cuentas_por_pagar ORDER BY fecha_vencimiento")
-    for c in cxp:
-        pdf.cell(0, 8, f"{c['proveedor']} - {c['monto']} {c['moneda']} - Vence: {c['fecha_vencimiento']} - Estado: {c['estado']}", ln=1)
+    texto = "\n".join(fmt_cuenta(c['proveedor'], c['monto'], c['moneda'], c['fecha_vencimiento'], c['estado'])
+                      for c in DB.iter("SELECT proveedor, monto, moneda, fecha_vencimiento, estado FROM cuentas_por_pagar ORDER BY fecha_vencimiento"))
+    if texto:
+        pdf.multi_cell(0, 8, texto)
 
     pdf.output(filename)
     return filename
@@ -277,26 +634,48 @@ class App(Tk):
         self.geometry("900x650")
         self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.current_user = None
+        # Pool compartido para backup y generación de PDF: el mainloop de Tk
+        # nunca se bloquea con I/O de disco
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sf-bg")
+        # (version, filas) de la primera página del historial; ver _HIST_VERSION
+        self._hist_cache = None
+        # Frame del historial construido una sola vez y versión mostrada
+        self._hist_frame = None
+        self._hist_reload = None
+        self._hist_shown = -1
+        # (mtime_ns, version) del archivo de actualización
+        self._ver_cache = None
+        # True cuando ya se comprobó que existe al menos un usuario master
+        self._has_master = False
+        # (data_version, balances) del último cálculo de balance
+        self._balance_cache = None
+        # Notebook principal cacheado por tipo de usuario y su refresco
+        self._main_nb = None
+        self._main_nb_tipo = None
+        self._tx_reload = None
         self.create_login_screen()
         self.backup_on_startup()
         self.after(60 * 60 * 1000, self.backup_periodic)  # backup cada hora
 
+    def _backup_async(self, contexto):
+        def done(fut):
+            success, msg = fut.result()
+            if success:
+                print(f"Backup {contexto}: {msg}")
+            else:
+                print(f"Error backup {contexto}: {msg}")
+        self._executor.submit(backup_database).add_done_callback(done)
+
     def backup_on_startup(self):
-        success, msg = backup_database()
-        if success:
-            print(f"Backup realizado al iniciar: {msg}")
-        else:
-            print(f"Error backup al iniciar: {msg}")
+        self._backup_async("realizado al iniciar")
 
     def backup_periodic(self):
-        success, msg = backup_database()
-        if success:
-            print(f"Backup periódico realizado: {msg}")
-        else:
-            print(f"Error backup periódico: {msg}")
+        self._backup_async("periódico realizado")
         self.after(60 * 60 * 1000, self.backup_periodic)
 
     def on_close(self):
+        # Se esperan las tareas de fondo pendientes antes del backup final
+        self._executor.shutdown(wait=True)
         # Backup al cerrar app
         success, msg = backup_database()
         if success:
@@ -306,8 +685,13 @@ class App(Tk):
         self.destroy()
 
     def clear_screen(self):
+        # Los frames persistentes se desempacan en vez de destruirse para
+        # no reconstruir sus widgets en cada navegación
         for widget in self.winfo_children():
-            widget.destroy()
+            if widget is self._hist_frame or widget is self._main_nb:
+                widget.pack_forget()
+            else:
+                widget.destroy()
     
     def open_trash_bin(self):
         self.clear_screen()
@@ -318,20 +702,30 @@ class App(Tk):
 
         cols = ("ID", "Usuario", "Tipo", "Monto", "Moneda", "Medio", "Descripción", "Fecha")
         tree = ttk.Treeview(frame, columns=cols, show="headings")
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, width=100, stretch=False)
+        _setup_tree_columns(tree, cols, width=100)
         tree.pack(expand=1, fill=BOTH, padx=10, pady=10)
 
+        PAGE = 200
+        del_offset = [0]
+
+        def load_more_deleted():
+            data = DB.query_tuples(SQL_LOAD_DELETED, (PAGE, del_offset[0]))
+            filas = [
+                (tid, usuario, tipo, f"{monto:.2f}", moneda, medio, desc or "", fecha)
+                for tid, usuario, tipo, monto, moneda, medio, desc, fecha in data
+            ]
+            insert = tree.insert
+            for values in filas:
+                insert("", END, values=values)
+            del_offset[0] += len(data)
+            btn_more.config(state=NORMAL if len(data) == PAGE else DISABLED)
+
         def load_deleted():
-            for row in tree.get_children():
-                tree.delete(row)
-            data = DB.query("SELECT * FROM transacciones WHERE eliminado = 1 ORDER BY fecha DESC")
-            for d in data:
-                tree.insert("", END, values=(
-                    d["id"], d["usuario"], d["tipo"], f"{d['monto']:.2f}", d["moneda"], d["medio"],
-                    d["descripcion"] or "", d["fecha"]
-                ))
+            hijos = tree.get_children()
+            if hijos:
+                tree.delete(*hijos)
+            del_offset[0] = 0
+            load_more_deleted()
 
         def restore_transaction():
             selected = tree.selection()
@@ -339,9 +733,10 @@ class App(Tk):
                 messagebox.showwarning("Error", "Seleccione una transacción para restaurar")
                 return
             tid = tree.item(selected[0])["values"][0]
-            DB.execute("UPDATE transacciones SET eliminado = 0 WHERE id = ?", (tid,))
             if self.current_user:
-                log_change(self.current_user["username"], "restore", "transacciones", tid, "Restaurada desde papelera")
+                with DB.transaction() as conn:
+                    conn.execute("UPDATE transacciones SET eliminado = 0 WHERE id = ?", (tid,))
+                    log_change(self.current_user["username"], "restore", "transacciones", tid, "Restaurada desde papelera", conn=conn)
                 load_deleted()
         
         def permanently_delete_transaction():
@@ -351,13 +746,16 @@ class App(Tk):
                 return
             tid = tree.item(selected[0])["values"][0]
             if messagebox.askyesno("Confirmar", "¿Eliminar esta transacción de forma permanente?"):
-                DB.execute("DELETE FROM transacciones WHERE id = ?", (tid,))
                 if self.current_user:
-                    log_change(self.current_user["username"], "purge", "transacciones", tid, "Eliminación definitiva desde papelera")
+                    with DB.transaction() as conn:
+                        conn.execute("DELETE FROM transacciones WHERE id = ?", (tid,))
+                        log_change(self.current_user["username"], "purge", "transacciones", tid, "Eliminación definitiva desde papelera", conn=conn)
                     load_deleted()
 
         Button(frame, text="Restaurar", command=restore_transaction).pack(pady=5)
         Button(frame, text="Eliminar Permanentemente", fg="red", command=permanently_delete_transaction).pack(pady=5)
+        btn_more = Button(frame, text="Cargar más", command=load_more_deleted)
+        btn_more.pack(pady=5)
         Button(frame, text="Volver", command=self.create_main_screen).pack(pady=5)
 
         load_deleted()
@@ -393,10 +791,12 @@ class App(Tk):
         
         Button(frame, text="Ingresar", command=login).grid(row=2, column=0, columnspan=2, pady=10)
         Button(frame, text="Registrarse", command=lambda: self.create_user_registration_screen(solo_estandar=True)).grid(row=4, column=0, columnspan=2)
-        # Crear usuario master si no existe ninguno
-        masters = DB.query("SELECT * FROM usuarios WHERE tipo='master'")
-        if not masters:
-            if messagebox.askyesno("Registro inicial", "No hay usuario MASTER. Crear uno ahora?"):
+        # Crear usuario master si no existe ninguno. Una vez visto un master
+        # el flag evita repetir la consulta en cada pantalla de login.
+        if not self._has_master:
+            if DB.query("SELECT 1 FROM usuarios WHERE tipo='master' LIMIT 1"):
+                self._has_master = True
+            elif messagebox.askyesno("Registro inicial", "No hay usuario MASTER. Crear uno ahora?"):
                 self.create_user_registration_screen(master_creation=True)
 
     # ---------------------
@@ -430,9 +830,21 @@ class App(Tk):
         ayuda_menu.add_command(label="Verificar actualización", command=self.check_update)
         menubar.add_cascade(label="Ayuda", menu=ayuda_menu)
 
-        # Pestañas
+        # Pestañas: el notebook completo se construye una vez por tipo de
+        # usuario; volver a la pantalla principal solo lo re-empaca y
+        # refresca la lista de transacciones
+        tipo = self.current_user["tipo"] if self.current_user else None
+        if self._main_nb is not None and self._main_nb_tipo == tipo:
+            self._main_nb.pack(expand=1, fill="both")
+            if self._tx_reload is not None:
+                self._tx_reload()
+            return
+        if self._main_nb is not None:
+            self._main_nb.destroy()
         tab_control = ttk.Notebook(self)
         tab_control.pack(expand=1, fill="both")
+        self._main_nb = tab_control
+        self._main_nb_tipo = tipo
 
         # Pestaña transacciones
         tab_transacciones = Frame(tab_control)
@@ -463,6 +875,12 @@ class App(Tk):
     def logout(self):
         if messagebox.askyesno("Cerrar Sesión", "¿Desea cerrar sesión?"):
             self.current_user = None
+            # El notebook cacheado pertenece a la sesión que termina
+            if self._main_nb is not None:
+                self._main_nb.destroy()
+                self._main_nb = None
+                self._main_nb_tipo = None
+                self._tx_reload = None
             self.create_login_screen()
 
     # ---------------------
@@ -527,6 +945,9 @@ class App(Tk):
                     INSERT INTO usuarios (nombre, apellido, cedula, username, password, tipo)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, (nombre, apellido, cedula, username, hashed, tipo))
+                get_user.cache_clear()
+                if tipo == "master":
+                    self._has_master = True
                 messagebox.showinfo("Éxito", "Usuario registrado correctamente")
                 self.create_login_screen()
             except Exception as e:
@@ -546,6 +967,9 @@ class App(Tk):
             "mercantil": "Mercantil",
             "banesco": "Banesco"
         }
+        # Mapa inverso precalculado: etiqueta visible -> clave interna
+        banco_reverse = {v: k for k, v in banco_labels.items()}
+        DateEntry = _get_date_entry()
         frm_top = Frame(container)
         frm_top.pack(fill=X, pady=5)
         frm_buttons = Frame(container)
@@ -561,7 +985,7 @@ class App(Tk):
         # Campos de entrada
         Label(frm_top, text="Tipo:").grid(row=0, column=0)
         tipo_var = StringVar(value="entrada")
-        ttk.Combobox(frm_top, textvariable=tipo_var, values=["entrada", "salida"], state="readonly", width=10).grid(row=0, column=1)
+        ttk.Combobox(frm_top, textvariable=tipo_var, values=TIPOS_TRANSACCION, state="readonly", width=10).grid(row=0, column=1)
 
         Label(frm_top, text="Monto:").grid(row=0, column=2)
         monto_entry = Entry(frm_top, width=15)
@@ -569,7 +993,7 @@ class App(Tk):
 
         Label(frm_top, text="Moneda:").grid(row=0, column=4)
         moneda_var = StringVar(value="Bs")
-        ttk.Combobox(frm_top, textvariable=moneda_var, values=["Bs", "USD"], state="readonly", width=5).grid(row=0, column=5)
+        ttk.Combobox(frm_top, textvariable=moneda_var, values=MONEDAS, state="readonly", width=5).grid(row=0, column=5)
 
         def on_medio_change(*args):
             if moneda_var.get() == "USD":
@@ -587,7 +1011,7 @@ class App(Tk):
         
         Label(frm_top, text="Medio:").grid(row=0, column=6)
         medio_var = StringVar(value="fisico")
-        medio_menu = ttk.Combobox(frm_top, textvariable=medio_var, values=["fisico", "digital"], state="readonly", width=7)
+        medio_menu = ttk.Combobox(frm_top, textvariable=medio_var, values=MEDIOS, state="readonly", width=7)
         medio_menu.grid(row=0, column=7)
 
         moneda_var.trace_add("write", on_medio_change)
@@ -599,7 +1023,6 @@ class App(Tk):
         banco_cb = ttk.Combobox(frm_top, textvariable=banco_var, values=banco_display, state="readonly", width=12)
         banco_cb.grid(row=0, column=9)
 
-        medio_var.trace_add("write", on_medio_change)
         on_medio_change()
 
         Label(frm_top, text="Descripción:").grid(row=1, column=6)
@@ -615,50 +1038,73 @@ class App(Tk):
         # Tabla
         cols = ("ID", "Usuario", "Tipo", "Monto", "Moneda", "Medio", "Banco", "Descripción", "Fecha")
         tree = ttk.Treeview(frm_table, columns=cols, show="headings")
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, minwidth=50, width=90, stretch=False)
+        _setup_tree_columns(tree, cols, width=90)
         tree.pack(expand=1, fill=BOTH)
 
-        def load_transactions():
-            for row in tree.get_children():
-                tree.delete(row)
-            data = DB.query("SELECT * FROM transacciones WHERE eliminado = 0 ORDER BY fecha DESC")
-            for d in data:
-                tree.insert("", END, values=(
-                    d["id"], d["usuario"], d["tipo"], f"{d['monto']:.2f}", d["moneda"], d["medio"], banco_labels.get(d["banco"], d["banco"]), d["descripcion"] or "", d["fecha"]
-                ))
-
-            # Balance general
-            entradas = DB.query("SELECT SUM(monto) as total FROM transacciones WHERE tipo='entrada' AND eliminado = 0")
-            salidas = DB.query("SELECT SUM(monto) as total FROM transacciones WHERE tipo='salida' AND eliminado = 0")
-
-            total_entrada = entradas[0]["total"] or 0
-            total_salida = salidas[0]["total"] or 0
+        # Balances en caché: se calculan en la carga inicial y se ajustan
+        # por ±monto en cada alta/baja, sin reconsultar la base
+        balances = {"Bs": 0.0, "USD": 0.0}
+        # Paginación: el Treeview carga de a PAGE filas para que el costo por
+        # refresco quede acotado aunque la tabla crezca sin límite
+        PAGE = 500
+        tx_offset = [0]
+
+        def update_balance_label():
+            balance_label.config(text=f"Balance Bs: {balances['Bs']:.2f} | USD: {balances['USD']:.2f}")
+
+        def load_more_transactions():
+            data = DB.query_tuples(SQL_LOAD_TX, (PAGE, tx_offset[0]))
+            # Tuplas crudas desempacadas posicionalmente y tree.insert ligado
+            # localmente: el bucle caliente queda sin búsquedas por clave
+            filas = [
+                (str(tid), (tid, usuario, tipo, f"{monto:.2f}", moneda, medio,
+                            banco_labels.get(banco, banco), desc or "", fecha))
+                for tid, usuario, tipo, monto, moneda, medio, banco, desc, fecha in data
+            ]
+            insert = tree.insert
+            exists = tree.exists
+            for iid, values in filas:
+                # iid = id de la fila: altas y bajas posteriores son O(1).
+                # exists cubre filas ya mostradas por un alta incremental
+                if not exists(iid):
+                    insert("", END, iid=iid, values=values)
+            tx_offset[0] += len(data)
+            btn_more.config(state=NORMAL if len(data) == PAGE else DISABLED)
 
-            # Balance por moneda añadiendo CXC y CXP
+        def load_transactions():
+            children = tree.get_children()
+            if children:
+                tree.delete(*children)
+            tx_offset[0] = 0
+            load_more_transactions()
+
+            # Si no hubo escrituras desde el último cálculo se reutiliza el
+            # balance cacheado sin tocar la base
+            version = DB.data_version()
+            cache = self._balance_cache
+            if cache is not None and cache[0] == version:
+                balances.update(cache[1])
+                update_balance_label()
+                return
 
-            # Bs
-            entradas_bs = DB.query("SELECT SUM(monto) FROM transacciones WHERE tipo='entrada' AND eliminado=0 AND moneda='Bs'")[0][0] or 0
-            salidas_bs = DB.query("SELECT SUM(monto) FROM transacciones WHERE tipo='salida' AND eliminado=0 AND moneda='Bs'")[0][0] or 0
-            cxc_bs = DB.query("SELECT SUM(monto) FROM cuentas_por_cobrar WHERE estado='pagada' AND moneda='Bs'")[0][0] or 0
-            cxp_bs = DB.query("SELECT SUM(monto) FROM cuentas_por_pagar WHERE estado='pagada' AND moneda='Bs'")[0][0] or 0
-            balance_bs = entradas_bs - salidas_bs + cxc_bs - cxp_bs
+            # Balance por moneda añadiendo CXC y CXP: un solo GROUP BY
+            # moneda/tipo en vez de una consulta SUM por combinación
+            sumas = {(r["moneda"], r["tipo"]): r["total"] or 0 for r in DB.query(SQL_SUM_TX)}
 
-            # USD
-            entradas_usd = DB.query("SELECT SUM(monto) FROM transacciones WHERE tipo='entrada' AND eliminado=0 AND moneda='USD'")[0][0] or 0
-            salidas_usd = DB.query("SELECT SUM(monto) FROM transacciones WHERE tipo='salida' AND eliminado=0 AND moneda='USD'")[0][0] or 0
-            cxc_usd = DB.query("SELECT SUM(monto) FROM cuentas_por_cobrar WHERE estado='pagada' AND moneda='USD'")[0][0] or 0
-            cxp_usd = DB.query("SELECT SUM(monto) FROM cuentas_por_pagar WHERE estado='pagada' AND moneda='USD'")[0][0] or 0
-            balance_usd = entradas_usd - salidas_usd + cxc_usd - cxp_usd
+            # cxc/cxp pagadas: una consulta agrupada por tabla para ambas monedas
+            cxc = {r["moneda"]: r["total"] or 0 for r in DB.query(SQL_SUM_CXC)}
+            cxp = {r["moneda"]: r["total"] or 0 for r in DB.query(SQL_SUM_CXP)}
 
-            balance_label.config(text=f"Balance Bs: {balance_bs:.2f} | USD: {balance_usd:.2f}")
+            for moneda in MONEDAS:
+                balances[moneda] = (sumas.get((moneda, "entrada"), 0)
+                                    - sumas.get((moneda, "salida"), 0)
+                                    + cxc.get(moneda, 0) - cxp.get(moneda, 0))
+            self._balance_cache = (version, dict(balances))
+            update_balance_label()
 
         def add_transaction():
-            try:
-                monto = float(monto_entry.get())
-                banco = banco_var.get()
-            except ValueError:
+            monto = parse_monto(monto_entry.get())
+            if monto is None:
                 messagebox.showwarning("Error", "Monto y bancos deben ser números válidos")
                 return
             tipo = tipo_var.get()
@@ -675,20 +1121,31 @@ class App(Tk):
                 messagebox.showwarning("Error", "El monto debe ser mayor a cero")
                 return
             
-            banco_nombre = banco_var.get()
-            banco = [k for k, v in banco_labels.items() if v == banco_nombre][0]
+            banco = banco_reverse[banco_var.get()]
             if self.current_user:
                 fecha_seleccionada = fecha_entry.get_date()
-                DB.execute("""
-                    INSERT INTO transacciones (usuario, tipo, monto, moneda, medio, banco, descripcion, fecha)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (self.current_user["username"], tipo, monto, moneda, medio, banco, descripcion, fecha_seleccionada))
-                log_change(self.current_user["username"], "insert", "transacciones", DB.execute("SELECT last_insert_rowid()").fetchone()[0], descripcion)
+                # Transacción + registro de historial bajo un mismo commit:
+                # un solo fsync por clic en vez de dos
+                with DB.transaction() as conn:
+                    cur = conn.execute(SQL_INSERT_TX,
+                                       (self.current_user["username"], tipo, monto, moneda, medio, banco, descripcion, fecha_seleccionada))
+                    # lastrowid lo llena el driver en el INSERT: sin round-trip extra
+                    new_id = cur.lastrowid
+                    log_change(self.current_user["username"], "insert", "transacciones", new_id, descripcion, conn=conn)
                 messagebox.showinfo("Éxito", "Transacción registrada")
-                load_transactions()
+                # Alta incremental: una sola fila nueva en el Treeview y
+                # ajuste del balance en memoria, sin recargar toda la tabla
+                tree.insert("", 0, iid=str(new_id), values=(
+                    new_id, self.current_user["username"], tipo, f"{monto:.2f}", moneda, medio,
+                    banco_labels.get(banco, banco), descripcion or "", fecha_seleccionada
+                ))
+                balances[moneda] += monto if tipo == "entrada" else -monto
+                # La fila nueva corre la ventana de paginación: sin este +1
+                # el próximo "Cargar más" repetiría la fila del borde
+                tx_offset[0] += 1
+                update_balance_label()
                 # Limpiar
-                monto_entry.delete(0, END)
-                descripcion_entry.delete(0, END)
+                _clear_entries(monto_entry, descripcion_entry)
 
         def delete_transaction():
             selected = tree.selection()
@@ -698,16 +1155,29 @@ class App(Tk):
             if self.current_user and self.current_user["tipo"] != "master":
                 messagebox.showerror("Permiso denegado", "Solo usuarios MASTER pueden eliminar transacciones")
                 return
-            tid = tree.item(selected[0])["values"][0]
+            item = tree.item(selected[0])["values"]
+            tid = item[0]
             if self.current_user and messagebox.askyesno("Confirmar", "¿Eliminar transacción seleccionada?"):
-                DB.execute("UPDATE transacciones SET eliminado = 1 WHERE id = ?", (tid,))
-                log_change(self.current_user["username"], "delete", "transacciones", tid, "Eliminada desde interfaz")
-                load_transactions()
+                with DB.transaction() as conn:
+                    conn.execute("UPDATE transacciones SET eliminado = 1 WHERE id = ?", (tid,))
+                    log_change(self.current_user["username"], "delete", "transacciones", tid, "Eliminada desde interfaz", conn=conn)
+                # Baja incremental: se quita la fila y se revierte su monto
+                # del balance en memoria
+                tipo, monto, moneda = item[2], float(item[3]), item[4]
+                tree.delete(selected[0])
+                # La baja encoge la ventana de paginación: sin este -1 el
+                # próximo "Cargar más" saltaría una fila
+                tx_offset[0] -= 1
+                balances[moneda] -= monto if tipo == "entrada" else -monto
+                update_balance_label()
 
         Button(frm_buttons, text="Agregar", command=add_transaction).pack(side=LEFT, padx=5)
         if self.current_user and self.current_user["tipo"] == "master":
             Button(frm_buttons, text="Eliminar", command=delete_transaction).pack(side=LEFT, padx=5)
+        btn_more = Button(frm_buttons, text="Cargar más", command=load_more_transactions)
+        btn_more.pack(side=LEFT, padx=5)
 
+        self._tx_reload = load_transactions
         load_transactions()
 
     # ---------------------
@@ -731,7 +1201,7 @@ class App(Tk):
 
         Label(frm_top, text="Moneda:").grid(row=0, column=4)
         moneda_var = StringVar(value="Bs")
-        ttk.Combobox(frm_top, textvariable=moneda_var, values=["Bs", "USD"], state="readonly", width=5).grid(row=0, column=5)
+        ttk.Combobox(frm_top, textvariable=moneda_var, values=MONEDAS, state="readonly", width=5).grid(row=0, column=5)
 
         Label(frm_top, text="Fecha Vencimiento (YYYY-MM-DD):").grid(row=1, column=0)
         venc_entry = Entry(frm_top, width=15)
@@ -743,57 +1213,58 @@ class App(Tk):
 
         cols = ("ID", "Cliente", "Monto", "Moneda", "Vencimiento", "Estado", "Descripción", "Registro")
         tree = ttk.Treeview(frm_table, columns=cols, show="headings")
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, minwidth=50, width=100, stretch=False)
+        _setup_tree_columns(tree, cols, width=100)
         tree.pack(expand=1, fill=BOTH)
 
         def load_cxc():
-            for row in tree.get_children():
-                tree.delete(row)
-            data = DB.query("SELECT * FROM cuentas_por_cobrar ORDER BY fecha_vencimiento")
-            for d in data:
-                tree.insert("", END, values=(
-                    d["id"], d["cliente"], f"{d['monto']:.2f}", d["moneda"], d["fecha_vencimiento"], d["estado"],
-                    d["descripcion"] or "", d["fecha_registro"]
-                ))
+            hijos = tree.get_children()
+            if hijos:
+                tree.delete(*hijos)
+            data = DB.query_tuples(SQL_LOAD_CXC)
+            filas = [
+                (cid, cliente, monto, moneda, venc, estado, desc or "", registro)
+                for cid, cliente, monto, moneda, venc, estado, desc, registro in data
+            ]
+            # Columnas ocultas durante la carga masiva: un solo relayout
+            prev_cols = tree["displaycolumns"]
+            tree.configure(displaycolumns=())
+            insert = tree.insert
+            for values in filas:
+                insert("", END, values=values)
+            tree.configure(displaycolumns=prev_cols)
 
         def add_cxc():
             cliente = cliente_entry.get().strip()
             desc = descripcion_entry.get().strip()
             moneda = moneda_var.get()
-            try:
-                monto = float(monto_entry.get())
-            except:
+            monto = parse_monto(monto_entry.get())
+            if monto is None:
                 messagebox.showwarning("Error", "Monto inválido")
                 return
             fecha_venc = venc_entry.get().strip()
-            try:
-                datetime.strptime(fecha_venc, "%Y-%m-%d")
-            except:
+            if parse_fecha_iso(fecha_venc) is None:
                 messagebox.showwarning("Error", "Formato de fecha vencimiento inválido")
                 return
             if monto <= 0 or not cliente:
                 messagebox.showwarning("Error", "Complete todos los campos correctamente")
                 return
-            DB.execute("""
-                INSERT INTO cuentas_por_cobrar (cliente, monto, moneda, fecha_vencimiento, descripcion)
-                VALUES (?, ?, ?, ?, ?)
-            """, (cliente, monto, moneda, fecha_venc, desc))
+            DB.execute(SQL_INSERT_CXC, (cliente, monto, moneda, fecha_venc, desc))
             messagebox.showinfo("Éxito", "Cuenta por cobrar registrada")
             load_cxc()
-            cliente_entry.delete(0, END)
-            monto_entry.delete(0, END)
-            venc_entry.delete(0, END)
-            descripcion_entry.delete(0, END)
+            _clear_entries(cliente_entry, monto_entry, venc_entry, descripcion_entry)
 
         def mark_paid_cxc():
             selected = tree.selection()
             if not selected:
                 messagebox.showwarning("Error", "Seleccione una cuenta por cobrar")
                 return
-            cid = tree.item(selected[0])["values"][0]
-            DB.execute("UPDATE cuentas_por_cobrar SET estado = 'pagada' WHERE id = ?", (cid,))
+            # Selección múltiple: un solo UPDATE ... IN y un solo commit
+            ids = [tree.item(s)["values"][0] for s in selected]
+            if len(ids) == 1:
+                DB.execute(SQL_PAY_CXC, (ids[0],))
+            else:
+                marcas = ",".join("?" * len(ids))
+                DB.execute(f"UPDATE cuentas_por_cobrar SET estado = 'pagada' WHERE id IN ({marcas})", ids)
             messagebox.showinfo("Éxito", "Cuenta por cobrar marcada como pagada")
             load_cxc()
             self.create_main_screen()
@@ -825,7 +1296,7 @@ class App(Tk):
 
         Label(frm_top, text="Moneda:").grid(row=0, column=4)
         moneda_var = StringVar(value="Bs")
-        ttk.Combobox(frm_top, textvariable=moneda_var, values=["Bs", "USD"], state="readonly", width=5).grid(row=0, column=5)
+        ttk.Combobox(frm_top, textvariable=moneda_var, values=MONEDAS, state="readonly", width=5).grid(row=0, column=5)
 
         Label(frm_top, text="Fecha Vencimiento (YYYY-MM-DD):").grid(row=1, column=0)
         venc_entry = Entry(frm_top, width=15)
@@ -837,57 +1308,58 @@ class App(Tk):
 
         cols = ("ID", "Proveedor", "Monto", "Moneda", "Vencimiento", "Estado", "Descripción", "Registro")
         tree = ttk.Treeview(frm_table, columns=cols, show="headings")
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, minwidth=50, width=100, stretch=False)
+        _setup_tree_columns(tree, cols, width=100)
         tree.pack(expand=1, fill=BOTH)
 
         def load_cxp():
-            for row in tree.get_children():
-                tree.delete(row)
-            data = DB.query("SELECT * FROM cuentas_por_pagar ORDER BY fecha_vencimiento")
-            for d in data:
-                tree.insert("", END, values=(
-                    d["id"], d["proveedor"], f"{d['monto']:.2f}", d["moneda"], d["fecha_vencimiento"], d["estado"],
-                    d["descripcion"] or "", d["fecha_registro"]
-                ))
+            hijos = tree.get_children()
+            if hijos:
+                tree.delete(*hijos)
+            data = DB.query_tuples(SQL_LOAD_CXP)
+            filas = [
+                (cid, proveedor, monto, moneda, venc, estado, desc or "", registro)
+                for cid, proveedor, monto, moneda, venc, estado, desc, registro in data
+            ]
+            # Columnas ocultas durante la carga masiva: un solo relayout
+            prev_cols = tree["displaycolumns"]
+            tree.configure(displaycolumns=())
+            insert = tree.insert
+            for values in filas:
+                insert("", END, values=values)
+            tree.configure(displaycolumns=prev_cols)
 
         def add_cxp():
             proveedor = proveedor_entry.get().strip()
             desc = descripcion_entry.get().strip()
             moneda = moneda_var.get()
-            try:
-                monto = float(monto_entry.get())
-            except:
+            monto = parse_monto(monto_entry.get())
+            if monto is None:
                 messagebox.showwarning("Error", "Monto inválido")
                 return
             fecha_venc = venc_entry.get().strip()
-            try:
-                datetime.strptime(fecha_venc, "%Y-%m-%d")
-            except:
+            if parse_fecha_iso(fecha_venc) is None:
                 messagebox.showwarning("Error", "Formato de fecha vencimiento inválido")
                 return
             if monto <= 0 or not proveedor:
                 messagebox.showwarning("Error", "Complete todos los campos correctamente")
                 return
-            DB.execute("""
-                INSERT INTO cuentas_por_pagar (proveedor, monto, moneda, fecha_vencimiento, descripcion)
-                VALUES (?, ?, ?, ?, ?)
-            """, (proveedor, monto, moneda, fecha_venc, desc))
+            DB.execute(SQL_INSERT_CXP, (proveedor, monto, moneda, fecha_venc, desc))
             messagebox.showinfo("Éxito", "Cuenta por pagar registrada")
             load_cxp()
-            proveedor_entry.delete(0, END)
-            monto_entry.delete(0, END)
-            venc_entry.delete(0, END)
-            descripcion_entry.delete(0, END)
+            _clear_entries(proveedor_entry, monto_entry, venc_entry, descripcion_entry)
 
         def mark_paid_cxp():
             selected = tree.selection()
             if not selected:
                 messagebox.showwarning("Error", "Seleccione una cuenta por pagar")
                 return
-            cid = tree.item(selected[0])["values"][0]
-            DB.execute("UPDATE cuentas_por_pagar SET estado = 'pagada' WHERE id = ?", (cid,))
+            # Selección múltiple: un solo UPDATE ... IN y un solo commit
+            ids = [tree.item(s)["values"][0] for s in selected]
+            if len(ids) == 1:
+                DB.execute(SQL_PAY_CXP, (ids[0],))
+            else:
+                marcas = ",".join("?" * len(ids))
+                DB.execute(f"UPDATE cuentas_por_pagar SET estado = 'pagada' WHERE id IN ({marcas})", ids)
             messagebox.showinfo("Éxito", "Cuenta por pagar marcada como pagada")
             load_cxp()
             self.create_main_screen()
@@ -905,55 +1377,137 @@ class App(Tk):
         frm_top.pack(pady=10)
 
         Label(frm_top, text="Generar reporte completo:").pack(side=LEFT, padx=5)
-        Button(frm_top, text="Generar PDF", command=self.generate_report_pdf).pack(side=LEFT)
+        self.btn_report = Button(frm_top, text="Generar PDF", command=self.generate_report_pdf)
+        self.btn_report.pack(side=LEFT)
 
         self.report_label = Label(container, text="", fg="green")
         self.report_label.pack(pady=10)
 
     def generate_report_pdf(self):
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("PDF files", "*.pdf")],
-                initialfile=f"reporte_financiero_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            )
-            if not filename:
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            confirmoverwrite=True,
+            defaultextension=".pdf",
+            filetypes=[("PDF files", "*.pdf")],
+            initialfile="reporte_financiero_" + time.strftime(_TS_FMT) + ".pdf"
+        )
+        if not filename or not self.current_user:
+            return
+        username = self.current_user["username"]
+
+        # El PDF se genera en el pool y la finalización vuelve al hilo de Tk
+        # vía after(); la interfaz sigue respondiendo durante el reporte.
+        # El botón se deshabilita mientras tanto para evitar reentradas.
+        self.btn_report.config(state=DISABLED)
+
+        def done(fut):
+            self.after(0, lambda: self.btn_report.config(state=NORMAL))
+            try:
+                fut.result()
+            except Exception as e:
+                self.after(0, lambda e=e: messagebox.showerror("Error", f"No se pudo generar el reporte: {e}"))
                 return
-            if self.current_user:
-                generate_pdf_report(self.current_user["username"], filename)
+
+            def notify():
                 self.report_label.config(text=f"Reporte generado: {filename}")
                 messagebox.showinfo("Reporte", f"Reporte PDF generado correctamente en:\n{filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo generar el reporte: {e}")
+            self.after(0, notify)
+
+        self._executor.submit(generate_pdf_report, username, filename).add_done_callback(done)
 
     # ---------------------
     # HISTORIAL DE CAMBIOS
 
     def view_change_history(self):
         self.clear_screen()
+        # El frame con sus 7 columnas configuradas se construye una sola vez;
+        # las visitas siguientes solo lo re-empacan y recargan si hubo escrituras
+        if self._hist_frame is not None:
+            self._hist_frame.pack(expand=1, fill=BOTH)
+            if self._hist_shown != _HIST_VERSION[0]:
+                self._hist_reload()
+            return
         frame = Frame(self)
         frame.pack(expand=1, fill=BOTH)
+        self._hist_frame = frame
 
         Label(frame, text="Historial de Cambios", font=("Arial", 14, "bold")).pack(pady=10)
 
         cols = ("ID", "Usuario", "Acción", "Tabla", "ID Registro", "Descripción", "Fecha")
         tree = ttk.Treeview(frame, columns=cols, show="headings")
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, minwidth=50, width=120, stretch=False)
+        _setup_tree_columns(tree, cols, width=120)
         tree.pack(expand=1, fill=BOTH, padx=10, pady=10)
 
-        def load_history():
-            for row in tree.get_children():
-                tree.delete(row)
-            data = DB.query("SELECT * FROM historial_cambios ORDER BY fecha DESC LIMIT 1000")
+        PAGE = 100
+        hist_offset = [0]
+
+        fetch_stmt = DB.prepare(
+            "SELECT id, usuario, accion, tabla, registro_id, COALESCE(descripcion, ''), fecha"
+            " FROM historial_cambios ORDER BY fecha DESC LIMIT ? OFFSET ?"
+        )
+
+        def fetch_page():
+            return fetch_stmt((PAGE, hist_offset[0]))
+
+        def show_page(data):
+            # Se desempaca el arbol y se ocultan las columnas durante la
+            # carga masiva: Tk no recalcula geometria ni anchos por fila
+            prev_cols = tree["displaycolumns"]
+            tree.configure(displaycolumns=())
+            tree.pack_forget()
+            insert = tree.insert
             for d in data:
-                tree.insert("", END, values=(
-                    d["id"], d["usuario"], d["accion"], d["tabla"], d["registro_id"], d["descripcion"] or "", d["fecha"]
-                ))
-        load_history()
+                insert("", END, values=d)
+            tree.configure(displaycolumns=prev_cols)
+            tree.pack(expand=1, fill=BOTH, padx=10, pady=10)
+            hist_offset[0] += len(data)
+            btn_more.config(state=NORMAL if len(data) == PAGE else DISABLED)
 
-        Button(frame, text="Volver", command=self.create_main_screen).pack(pady=10)
+        cargando = [False]
+
+        def load_more_history():
+            # Evita reentradas cuando el propio insert mueve el scroll
+            if cargando[0]:
+                return
+            cargando[0] = True
+            try:
+                show_page(fetch_page())
+            finally:
+                cargando[0] = False
+
+        def load_history():
+            hijos = tree.get_children()
+            if hijos:
+                tree.delete(*hijos)
+            hist_offset[0] = 0
+            # Si el historial no cambió desde la última vista se reutiliza
+            # la primera página cacheada sin tocar la base
+            version = _HIST_VERSION[0]
+            cache = self._hist_cache
+            if cache is not None and cache[0] == version:
+                data = cache[1]
+            else:
+                data = fetch_page()
+                self._hist_cache = (version, data)
+            self._hist_shown = version
+            show_page(data)
+
+        frm_botones = Frame(frame)
+        frm_botones.pack(pady=10)
+        btn_more = Button(frm_botones, text="Cargar más", command=load_more_history)
+        btn_more.pack(side=LEFT, padx=5)
+        Button(frm_botones, text="Volver", command=self.create_main_screen).pack(side=LEFT, padx=5)
+
+        # Carga por demanda: al llegar el scroll al fondo se pide la página
+        # siguiente sin pasar por el botón
+        def on_scroll(first, last):
+            if float(last) >= 1.0 and str(btn_more["state"]) == "normal":
+                load_more_history()
+
+        tree.configure(yscrollcommand=on_scroll)
+
+        self._hist_reload = load_history
+        load_history()
 
     # ---------------------
     # AYUDA / ACERCA DE
@@ -962,26 +1516,72 @@ class App(Tk):
         messagebox.showinfo("Acerca de", f"Sistema Financiero Completo\nVersión {APP_VERSION}\nDesarrollado por Ing Douglas Hidalgo ft. Christopher Aponte")
 
     def check_update(self):
-        # Demo muy básico de actualización: solo verifica un archivo local con versión
-        if not os.path.exists(VERSION_CHECK_FILE):
+        # Demo muy básico de actualización: solo verifica un archivo local con versión.
+        # El contenido se cachea por mtime: chequeos repetidos cuestan un solo stat.
+        try:
+            st = os.stat(VERSION_CHECK_FILE)
+        except FileNotFoundError:
             messagebox.showinfo("Actualización", "No se encontró información de actualización.")
             return
-        with open(VERSION_CHECK_FILE, "r") as f:
-            latest_version = f.read().strip()
-        if latest_version > APP_VERSION:
-            messagebox.showinfo("Actualización disponible", f"Existe una versión más reciente: {latest_version}\nDescargue la nueva versión desde el sitio oficial.")
-        else:
-            messagebox.showinfo("Actualización", "Usted tiene la última versión.")
+        def notify(latest_version):
+            # version.txt puede traer cualquier cosa ("1.0.1-beta", vacío);
+            # un contenido no numérico no debe tumbar el diálogo
+            try:
+                hay_nueva = _parse_ver(latest_version) > APP_VERSION_T
+            except ValueError:
+                messagebox.showinfo("Actualización", "No se encontró información de actualización.")
+                return
+            if hay_nueva:
+                messagebox.showinfo("Actualización disponible", f"Existe una versión más reciente: {latest_version}\nDescargue la nueva versión desde el sitio oficial.")
+            else:
+                messagebox.showinfo("Actualización", "Usted tiene la última versión.")
+
+        if self._ver_cache is not None and self._ver_cache[0] == st.st_mtime_ns:
+            notify(self._ver_cache[1])
+            return
+
+        # La lectura va al pool (un FS lento no congela la interfaz) y el
+        # resultado vuelve al hilo de Tk vía after()
+        def worker():
+            # Lectura binaria sin buffer: el archivo contiene solo la versión
+            with open(VERSION_CHECK_FILE, "rb", buffering=0) as f:
+                latest_version = f.read(64).decode("ascii").strip()
+            self._ver_cache = (st.st_mtime_ns, latest_version)
+            return latest_version
+
+        def done(fut):
+            # Un fallo del worker (archivo borrado entre el stat y el open,
+            # bytes no ASCII) también debe terminar en un diálogo
+            try:
+                latest_version = fut.result()
+            except Exception:
+                self.after(0, lambda: messagebox.showinfo(
+                    "Actualización", "No se encontró información de actualización."))
+                return
+            self.after(0, lambda: notify(latest_version))
+
+        self._executor.submit(worker).add_done_callback(done)
 
     # ---------------------
     # BACKUP MANUAL
 
     def backup_manual(self):
-        success, msg = backup_database()
-        if success:
-            messagebox.showinfo("Backup", f"Backup realizado correctamente:\n{msg}")
-        else:
-            messagebox.showerror("Backup", f"Error al hacer backup:\n{msg}")
+        # El backup corre en el pool (la API online de SQLite copia por
+        # páginas) y el resultado vuelve al hilo de Tk vía after()
+        def done(fut):
+            try:
+                success, msg = fut.result()
+            except Exception as e:
+                success, msg = False, str(e)
+
+            def notify():
+                if success:
+                    messagebox.showinfo("Backup", f"Backup realizado correctamente:\n{msg}")
+                else:
+                    messagebox.showerror("Backup", f"Error al hacer backup:\n{msg}")
+            self.after(0, notify)
+
+        self._executor.submit(backup_database).add_done_callback(done)
 
 # ------------------------------
 #COMPARATIVO POR FECHA 
@@ -999,30 +1599,36 @@ class App(Tk):
         scroll.pack(side=RIGHT, fill=Y)
         texto.config(yscrollcommand=scroll.set)
 
+        # (clave, contenido) del último cálculo; la clave cambia con el día
+        # o con cualquier escritura en la base
+        comp_cache = [None]
+
         def calcular_comparativo():
             hoy = datetime.now().date()
-            hace_7 = hoy - timedelta(days=7)
-            hace_30 = hoy - timedelta(days=30)
-
-            def obtener_balance(moneda, desde):
-                res = DB.query("""
-                    SELECT SUM(CASE WHEN tipo='entrada' THEN monto ELSE -monto END) as balance
-                    FROM transacciones
-                    WHERE eliminado = 0 AND moneda = ? AND date(fecha) >= ?
-                """, (moneda, str(desde)))
-                return res[0]["balance"] or 0
+            clave = (hoy, DB.data_version())
+            if comp_cache[0] is not None and comp_cache[0][0] == clave:
+                contenido = comp_cache[0][1]
+            else:
+                filas = {r["moneda"]: r for r in DB.query(SQL_COMPARATIVO, {
+                    "hoy": str(hoy),
+                    "hace_7": str(hoy - timedelta(days=7)),
+                    "hace_30": str(hoy - timedelta(days=30)),
+                })}
+                partes = ["=== COMPARATIVO DE BALANCES ===\n\n"]
+                for moneda in MONEDAS:
+                    r = filas.get(moneda)
+                    dia = (r["dia"] if r else 0) or 0
+                    semana = (r["semana"] if r else 0) or 0
+                    mes = (r["mes"] if r else 0) or 0
+                    partes.append(f"Moneda: {moneda}\n")
+                    partes.append(f"  ➤ Hoy: {dia:.2f}\n")
+                    partes.append(f"  ➤ Últimos 7 días: {semana:.2f}\n")
+                    partes.append(f"  ➤ Últimos 30 días: {mes:.2f}\n\n")
+                contenido = "".join(partes)
+                comp_cache[0] = (clave, contenido)
 
             texto.delete(1.0, END)
-            texto.insert(END, "=== COMPARATIVO DE BALANCES ===\n\n")
-
-            for moneda in ["Bs", "USD"]:
-                texto.insert(END, f"Moneda: {moneda}\n")
-                dia = obtener_balance(moneda, hoy)
-                semana = obtener_balance(moneda, hace_7)
-                mes = obtener_balance(moneda, hace_30)
-                texto.insert(END, f"  ➤ Hoy: {dia:.2f}\n")
-                texto.insert(END, f"  ➤ Últimos 7 días: {semana:.2f}\n")
-                texto.insert(END, f"  ➤ Últimos 30 días: {mes:.2f}\n\n")
+            texto.insert(END, contenido)
 
         Button(frm_top, text="Actualizar Comparativo", command=calcular_comparativo).pack()
         calcular_comparativo()